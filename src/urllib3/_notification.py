@@ -0,0 +1,55 @@
+import json
+import os
+import typing
+from dataclasses import dataclass, field
+
+if typing.TYPE_CHECKING:
+    from .deprecation import Logging_Configuration
+    from .jira import JIRA_Configuration
+    from .poolmanager import PoolManager
+    from .slack import Slack_Configuration
+
+@dataclass
+class _Settings:
+    """
+    Settings of the deprecation detection, changed by the setters of urllib3.deprecation.
+    The settings live in this module, so jira and slack can read them without importing urllib3.deprecation.
+    """
+    enabled: bool = False
+    http_header: list[str] = field(default_factory=list)
+    logging_cfg: "Logging_Configuration | None" = None
+    slack_cfg: "Slack_Configuration | None" = None
+    jira_cfg: "JIRA_Configuration | None" = None
+
+# The settings are only changed in place, so every module that imported them sees the changes.
+_settings = _Settings()
+
+# Shared PoolManager for the API calls of the notifications, created on first use.
+_HTTP: "PoolManager | None" = None
+
+def _get_http() -> "PoolManager":
+    """
+    Returns the shared PoolManager for the API calls, so connections are reused between calls.
+    """
+    global _HTTP
+    if _HTTP is None:
+        # Import needs to be inside the function to prevent circular imports.
+        from .poolmanager import PoolManager
+        _HTTP = PoolManager()
+    return _HTTP
+
+def _reset_after_fork() -> None:
+    """
+    Drops the shared PoolManager in a forked child process, so the child does not reuse the connections of the parent.
+    """
+    global _HTTP
+    _HTTP = None
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def _dumps(obj: typing.Any) -> bytes:
+    """
+    Serializes a request payload to compact JSON bytes.
+    """
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
@@ -1066,14 +1066,17 @@ class HTTPConnectionPool(ConnectionPool, RequestMethods):
                 deprecation_url = self.scheme + "://" + self.host + ":" + str(self.port) + url
 
                 # Make the developer aware of the deprecation.
-                if get_logging_configuration():
-                    create_log(get_logging_configuration(), deprecation_url, method, deprecated_parameter=deprecated_parameter if parameter_deprecated else None, deprecation_datetime=http_deprecation_datetime, sunset_datetime=http_sunset_datetime)
-                if get_slack_configuration():
-                    exists = check_if_already_send(get_slack_configuration(), deprecation_url, method, deprecated_parameter=deprecated_parameter if parameter_deprecated else None, deprecation_datetime=http_deprecation_datetime, sunset_datetime=http_sunset_datetime)
+                logging_config = get_logging_configuration()
+                if logging_config:
+                    create_log(logging_config, deprecation_url, method, deprecated_parameter=deprecated_parameter if parameter_deprecated else None, deprecation_datetime=http_deprecation_datetime, sunset_datetime=http_sunset_datetime)
+                slack_config = get_slack_configuration()
+                if slack_config:
+                    exists = check_if_already_send(slack_config, deprecation_url, method, deprecated_parameter=deprecated_parameter if parameter_deprecated else None, deprecation_datetime=http_deprecation_datetime, sunset_datetime=http_sunset_datetime)
                     if not exists:
-                        send_deprecation_webhook_slack(get_slack_configuration(), deprecation_url, method, deprecated_parameter=deprecated_parameter if parameter_deprecated else None, deprecation_datetime=http_deprecation_datetime, sunset_datetime=http_sunset_datetime)
-                if get_jira_configuration():
-                    config = create_base64_auth(get_jira_configuration())
+                        send_deprecation_webhook_slack(slack_config, deprecation_url, method, deprecated_parameter=deprecated_parameter if parameter_deprecated else None, deprecation_datetime=http_deprecation_datetime, sunset_datetime=http_sunset_datetime)
+                jira_config = get_jira_configuration()
+                if jira_config:
+                    config = create_base64_auth(jira_config)
                     exists = check_if_issue_exists(config, deprecation_url, method, deprecated_parameter=deprecated_parameter if parameter_deprecated else None, deprecation_datetime=http_deprecation_datetime, sunset_datetime=http_sunset_datetime)
                     if not exists:
                         create_new_jira_issue(config, deprecation_url, method, deprecated_parameter=deprecated_parameter if parameter_deprecated else None, deprecation_datetime=http_deprecation_datetime, sunset_datetime=http_sunset_datetime)
@@ -2,21 +2,35 @@ from .jira import JIRA_Configuration
 from .slack import Slack_Configuration
 import datetime
 import logging
+import threading
 from dataclasses import dataclass
 
+from ._notification import _settings
+
 
 @dataclass
 class Logging_Configuration:
-    lvl = logging.DEBUG
     file: str = "deprecation.log"
     format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    logger: logging.Logger = None
-
-DEPRECATION_DETECTION_ENABLED = False
-CUSTOM_HTTP_DEPRECATION_HEADER = []
-LOGGING_DEPRECATION_CONFIGURATION = None
-SLACK_DEPRECATION_CONFIGURATION = None
-JIRA_DEPRECATION_CONFIGURATION = None
+    logger: logging.Logger | None = None
+    # Last field, to keep the positional order of the other fields.
+    lvl: int = logging.DEBUG
+
+def _get_operation(oas: dict[str, str], path: str, method_lc: str) -> dict[str, str]:
+    """
+    Returns the operation object of an OpenAPI specification. The method needs to be lowercase already.
+    """
+    try:
+        paths = oas["paths"]
+        methods = paths[path]
+        return methods[method_lc]
+    except KeyError:
+        # Find out which level is missing to raise a precise error.
+        if "paths" not in oas:
+            raise KeyError("No paths found in the OpenAPI specification.") from None
+        if path not in oas["paths"]:
+            raise KeyError(f"Path {path} not found in the OpenAPI specification.") from None
+        raise KeyError(f"Method {method_lc.upper()} for path {path} not found in the OpenAPI specification.") from None
 
 def is_operation_deprecated(oas: dict[str, str], path: str, method: str) -> bool:
     """
@@ -32,16 +46,7 @@ def is_operation_deprecated(oas: dict[str, str], path: str, method: str) -> bool
     :return:
         Returns a bool whether the operation is deprecated.
     """
-    if path not in oas["paths"]:
-        raise KeyError(f"Path {path} not found in the OpenAPI specification.")
-    
-    if method.lower() not in oas["paths"][path]:
-        raise KeyError(f"Method {method.upper()} for path {path} not found in the OpenAPI specification.")
-    
-    if "deprecated" not in oas["paths"][path][method.lower()]:
-        return False
-    
-    return oas["paths"][path][method.lower()]["deprecated"]
+    return _get_operation(oas, path, method.lower()).get("deprecated", False)
 
 def are_parameter_deprecated(oas: dict[str, str], path: str, method: str, parameter: list[str]) -> tuple[bool, list[str]]:
     """
@@ -59,20 +64,20 @@ def are_parameter_deprecated(oas: dict[str, str], path: str, method: str, parame
     :return:
         Returns a tuple containing a bool whether parameter are deprecated and a list of parameter that are deprecated.
     """
-    if path not in oas["paths"]:
-        raise KeyError(f"Path {path} not found in the OpenAPI specification.")
-    
-    if method.lower() not in oas["paths"][path]:
-        raise KeyError(f"Method {method.upper()} for path {path} not found in the OpenAPI specification.")
-    
-    if "parameters" not in oas["paths"][path][method.lower()]:
-        raise KeyError(f"No parameters found for {path} with method {method.upper()} in the OpenAPI specification.")
-    
-    deprecatedParams = []
-    for parameter_object in oas["paths"][path][method.lower()]["parameters"]:
-        if "deprecated" in parameter_object and parameter_object["deprecated"] and parameter_object["name"] in parameter and parameter_object["in"] == "query":
-            deprecatedParams.append(parameter_object["name"])
-    
+    # Without parameter nothing can be deprecated, so the specification is not needed.
+    if not parameter:
+        return (False, [])
+
+    operation = _get_operation(oas, path, method.lower())
+    parameter_set = frozenset(parameter)
+    # Keeps the order of the parameter in the specification.
+    deprecatedParams = [
+        parameter_object["name"]
+        for parameter_object in operation.get("parameters", ())
+        if parameter_object.get("in") == "query"
+        and parameter_object.get("deprecated")
+        and parameter_object["name"] in parameter_set
+    ]
     return (deprecatedParams != [], deprecatedParams)
 
 def set_deprecation_notification(logging = None, slack: Slack_Configuration = None, jira: JIRA_Configuration = None) -> None:
@@ -83,13 +88,12 @@ def set_deprecation_notification(logging = None, slack: Slack_Configuration = No
     :param slack: Sets the slack configuration
     :param jira: Sets the jira configuration
     """
-    global LOGGING_DEPRECATION_CONFIGURATION, SLACK_DEPRECATION_CONFIGURATION, JIRA_DEPRECATION_CONFIGURATION
     if logging:
-        LOGGING_DEPRECATION_CONFIGURATION = logging
+        _settings.logging_cfg = logging
     if slack:
-        SLACK_DEPRECATION_CONFIGURATION = slack
+        _settings.slack_cfg = slack
     if jira:
-        JIRA_DEPRECATION_CONFIGURATION = jira
+        _settings.jira_cfg = jira
 
 def set_deprecation_http_header(http_header: list[str]) -> None:
     """
@@ -97,8 +101,7 @@ def set_deprecation_http_header(http_header: list[str]) -> None:
 
     :param http_header: A list of header names that should be used.
     """
-    global CUSTOM_HTTP_DEPRECATION_HEADER
-    CUSTOM_HTTP_DEPRECATION_HEADER = http_header
+    _settings.http_header = http_header
 
 def add_deprecation_http_header(http_header: list[str]) -> None:
     """
@@ -106,8 +109,7 @@ def add_deprecation_http_header(http_header: list[str]) -> None:
 
     :param http_header: A list of header names that should be used and extend the already existing ones.
     """
-    global CUSTOM_HTTP_DEPRECATION_HEADER 
-    CUSTOM_HTTP_DEPRECATION_HEADER.extend(http_header)
+    _settings.http_header.extend(http_header)
 
 def deprecation_detection(enabled: bool) -> None:
     """
@@ -115,15 +117,40 @@ def deprecation_detection(enabled: bool) -> None:
 
     :param enabled: Boolean whether or not the deprecation detection should be performed.
     """
-    global DEPRECATION_DETECTION_ENABLED
-    DEPRECATION_DETECTION_ENABLED = enabled
+    _settings.enabled = enabled
 
 def get_deprecation_detection() -> bool:
     """
     Returns whether deprecation detection is enabled or not.
     """
-    global DEPRECATION_DETECTION_ENABLED
-    return DEPRECATION_DETECTION_ENABLED
+    return _settings.enabled
+
+# Deprecation loggers by (file, format, level), created on first use.
+_LOGGERS: dict[tuple[str, str, int], logging.Logger] = {}
+_LOGGERS_LOCK = threading.Lock()
+
+def _get_logger(file: str, format: str, lvl: int) -> logging.Logger:
+    """
+    Returns the deprecation logger for the given settings. The logger is created on the first call and shared afterwards,
+    so configurations with the same settings do not add the file handler more than once.
+    Configurations with other settings get their own logger, so they do not share level and handler.
+
+    :param file: The file the log messages are written to
+    :param format: The format of the log messages
+    :param lvl: The level of the logger
+    """
+    with _LOGGERS_LOCK:
+        deprecation_logger = _LOGGERS.get((file, format, lvl))
+        if deprecation_logger is None:
+            # All loggers are named deprecation_logger, so they can not be registered with the logging module.
+            # Their records are still passed on to the registered deprecation_logger and the root logger.
+            deprecation_logger = logging.Logger("deprecation_logger", lvl)
+            deprecation_logger.parent = logging.getLogger("deprecation_logger")
+            file_handler = logging.FileHandler(file)
+            file_handler.setFormatter(logging.Formatter(format))
+            deprecation_logger.addHandler(file_handler)
+            _LOGGERS[(file, format, lvl)] = deprecation_logger
+        return deprecation_logger
 
 def create_log(config: Logging_Configuration, deprecation_url: str, http_method: str, deprecated_parameter: list[str] = None, deprecation_datetime: datetime.datetime = None, sunset_datetime: datetime.datetime = None) -> None:
     """
@@ -136,49 +163,45 @@ def create_log(config: Logging_Configuration, deprecation_url: str, http_method:
     :param deprecation_datetime: A datetime object of the deprecation HTTP header
     :param sunset_datetime: A datetime object of the sunset HTTP header
     """
-    # Create logger on the first call.
-    if config.logger == None:
-        depreacation_logger = logging.getLogger("deprecation_logger")
-        depreacation_logger.setLevel(config.lvl)
-        file_handler = logging.FileHandler(config.file)
-        formatter = logging.Formatter(config.format)
-        file_handler.setFormatter(formatter)
-        depreacation_logger.addHandler(file_handler)
-        config.logger = depreacation_logger
-    # Create log
-    log_message = (
-        f"Deprecation Alert: URL={deprecation_url}, "
-        f"HTTP Method={http_method}, "
-        f"Deprecated Parameters={deprecated_parameter if deprecated_parameter else "None"}, "
-        f"Deprecation Date={deprecation_datetime.isoformat() if deprecation_datetime else "None"}, "
-        f"Sunset Date={sunset_datetime.isoformat() if sunset_datetime else "None"}"
+    # Nothing to do if the deprecation detection is disabled.
+    if not _settings.enabled:
+        return
+
+    # Use the logger of the configuration if one is given, otherwise the shared logger for these settings.
+    logger = config.logger or _get_logger(config.file, config.format, config.lvl)
+    # Skip formatting the datetimes if the message would be dropped anyway.
+    if not logger.isEnabledFor(logging.WARNING):
+        return
+    # Create log. The message is only formatted by the logging module when the record is emitted.
+    logger.warning(
+        "Deprecation Alert: URL=%s, HTTP Method=%s, Deprecated Parameters=%s, Deprecation Date=%s, Sunset Date=%s",
+        deprecation_url,
+        http_method,
+        deprecated_parameter if deprecated_parameter else "None",
+        deprecation_datetime.isoformat() if deprecation_datetime else "None",
+        sunset_datetime.isoformat() if sunset_datetime else "None"
     )
-    config.logger.warning(log_message)
 
 def get_deprecation_http_header() -> list[str]:
     """
     Returns header fields that should be used to detect deprecation. "sunset" and "deprecation" are always used.
     """
-    global CUSTOM_HTTP_DEPRECATION_HEADER 
-    return CUSTOM_HTTP_DEPRECATION_HEADER
+    return _settings.http_header
 
-def get_logging_configuration() -> Logging_Configuration:
+def get_logging_configuration() -> Logging_Configuration | None:
     """
     Returns logging configuration for the notifications.
     """
-    global LOGGING_DEPRECATION_CONFIGURATION
-    return LOGGING_DEPRECATION_CONFIGURATION
+    return _settings.logging_cfg
 
-def get_slack_configuration() -> Slack_Configuration:
+def get_slack_configuration() -> Slack_Configuration | None:
     """
     Returns slack configuration for the notifications.
     """
-    global SLACK_DEPRECATION_CONFIGURATION
-    return SLACK_DEPRECATION_CONFIGURATION
+    return _settings.slack_cfg
 
-def get_jira_configuration() -> JIRA_Configuration:
+def get_jira_configuration() -> JIRA_Configuration | None:
     """
     Returns jira configuration for the notifications.
     """
-    global JIRA_DEPRECATION_CONFIGURATION
-    return JIRA_DEPRECATION_CONFIGURATION
\ No newline at end of file
+    return _settings.jira_cfg
\ No newline at end of file
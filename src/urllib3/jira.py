@@ -1,8 +1,15 @@
 import base64
 import datetime
-import json
+import functools
+import time
+import typing
 from dataclasses import dataclass
 
+from ._notification import _dumps, _get_http, _settings
+
+if typing.TYPE_CHECKING:
+    from .poolmanager import PoolManager
+
 @dataclass
 class JIRA_Configuration:
     API_URL: str
@@ -23,6 +30,11 @@ class JIRA_Configuration:
     DEPRECATED_PARAMETER_FIELD: str
     DEPRECATED_PARAMETER_FIELD_NAME: str
     BASE64_AUTH: str = None
+    AUTH_HEADER: str = None
+
+# Timezone of each jira server by API URL, together with the monotonic time it was fetched.
+_SERVER_TZ_CACHE: dict[str, tuple[datetime.tzinfo, float]] = {}
+_SERVER_TZ_TTL = 3600
 
 def create_base64_auth(config: JIRA_Configuration) -> JIRA_Configuration:
     """
@@ -33,8 +45,40 @@ def create_base64_auth(config: JIRA_Configuration) -> JIRA_Configuration:
     auth_str = f"{config.USER_EMAIL}:{config.API_TOKEN}"
     base64_auth = base64.b64encode(auth_str.encode("ascii"))
     config.BASE64_AUTH = base64_auth.decode("ascii")
+    config.AUTH_HEADER = f"Basic {config.BASE64_AUTH}"
     return config
 
+@functools.lru_cache(maxsize=8)
+def _base_header(authorization: str) -> dict[str, str]:
+    """
+    Returns the header for the HTTP requests to the jira API. The dict is shared between calls and must not be changed.
+
+    :param authorization: The value of the Authorization header
+    """
+    return {
+        'Content-Type': 'application/json',
+        'Accept': 'application/json',
+        'Authorization': authorization
+    }
+
+def _get_server_timezone(config: JIRA_Configuration, http: "PoolManager", header: dict[str, str]) -> datetime.tzinfo:
+    """
+    Returns the timezone of the jira server. The timezone is cached per API URL for an hour, to avoid a request on every call.
+
+    :param config: Configuration of the jira integration
+    :param http: The PoolManager used for the API call
+    :param header: The header for the HTTP request
+    """
+    cached = _SERVER_TZ_CACHE.get(config.API_URL)
+    if cached and time.monotonic() - cached[1] < _SERVER_TZ_TTL:
+        return cached[0]
+
+    response = http.request("GET", f"{config.API_URL}/3/serverInfo", headers=header)
+    server_datetime_string = response.json()["serverTime"]
+    server_datetime = datetime.datetime.fromisoformat(server_datetime_string)
+    _SERVER_TZ_CACHE[config.API_URL] = (server_datetime.tzinfo, time.monotonic())
+    return server_datetime.tzinfo
+
 def check_if_issue_exists(config: JIRA_Configuration, deprecation_url: str, http_method: str, deprecated_parameter: list[str] = None, deprecation_datetime: datetime.datetime = None, sunset_datetime: datetime.datetime = None) -> bool:
     """
     Checks if jira issue with the given parameter already exists. If only some deprecated_parameter are missing, they are added and returns true.
@@ -48,35 +92,46 @@ def check_if_issue_exists(config: JIRA_Configuration, deprecation_url: str, http
 
     :return: A bool whether the issue already exists.
     """
-
-    # Create the header for the HTTP request.
-    header = {
-        'Content-Type': 'application/json',
-        'Accept': 'application/json',
-        'Authorization': "Basic %s" % config.BASE64_AUTH
-    }
-
-    # Create new PoolManager for API calls. Import needs to be inside the function to prevent circular imports.
-    from .poolmanager import PoolManager
-    http = PoolManager()
-
-    # Create base query string to filter the issues, if the same one exists already.
-    queryString = f'type = {config.DEPRECATION_ISSUE_TYPE_KEY} AND project = {config.PROJECT_KEY} AND "{config.DEPRECATION_URL_FIELD_NAME.lower()}[url field]" = "{deprecation_url}" AND "{config.HTTP_METHOD_FIELD_NAME.lower()}[short text]" ~ "{http_method.upper()}" AND status != Done'
+    # Nothing to do if the deprecation detection is disabled.
+    if not _settings.enabled:
+        return False
+
+    if config.AUTH_HEADER is None:
+        raise ValueError("The jira configuration has no authentication, call create_base64_auth first.")
+
+    # Get the header for the HTTP request.
+    header = _base_header(config.AUTH_HEADER)
+
+    # Get the shared PoolManager for API calls.
+    http = _get_http()
+
+    # Create base query clauses to filter the issues, if the same one exists already.
+    queryParts = [
+        f'type = {config.DEPRECATION_ISSUE_TYPE_KEY}',
+        f'project = {config.PROJECT_KEY}',
+        f'"{config.DEPRECATION_URL_FIELD_NAME.lower()}[url field]" = "{deprecation_url}"',
+        f'"{config.HTTP_METHOD_FIELD_NAME.lower()}[short text]" ~ "{http_method.upper()}"',
+        'status != Done',
+    ]
     
-    # Get server datetime/timezone.
-    response = http.request("GET", f"{config.API_URL}/3/serverInfo", headers=header)
-    server_datetime_string = response.json()["serverTime"]
-    server_datetime = datetime.datetime.strptime(server_datetime_string, "%Y-%m-%dT%H:%M:%S.%f%z")
+    # Get server timezone, only needed to convert the optional datetimes.
+    if deprecation_datetime or sunset_datetime:
+        server_timezone = _get_server_timezone(config, http, header)
     
     # Add optional filter options.
     if deprecation_datetime:
-        deprecation_datetime = deprecation_datetime.astimezone(server_datetime.tzinfo)
-        queryString += f' AND "{config.DEPRECATION_HTTP_FIELD_NAME.lower()}[time stamp]" >= "{deprecation_datetime.strftime("%Y-%m-%d %H:%M")}" AND "{config.DEPRECATION_HTTP_FIELD_NAME.lower()}[time stamp]" <= "{deprecation_datetime.strftime("%Y-%m-%d %H:%M")}"'
+        deprecation_name = config.DEPRECATION_HTTP_FIELD_NAME.lower()
+        deprecation_string = deprecation_datetime.astimezone(server_timezone).strftime("%Y-%m-%d %H:%M")
+        queryParts.append(f'"{deprecation_name}[time stamp]" >= "{deprecation_string}"')
+        queryParts.append(f'"{deprecation_name}[time stamp]" <= "{deprecation_string}"')
     if sunset_datetime:
-        sunset_datetime = sunset_datetime.astimezone(server_datetime.tzinfo)
-        queryString += f' AND "{config.SUNSET_HTTP_FIELD_NAME.lower()}[time stamp]" >= "{sunset_datetime.strftime("%Y-%m-%d %H:%M")}" AND "{config.SUNSET_HTTP_FIELD_NAME.lower()}[time stamp]" <= "{sunset_datetime.strftime("%Y-%m-%d %H:%M")}"'
+        sunset_name = config.SUNSET_HTTP_FIELD_NAME.lower()
+        sunset_string = sunset_datetime.astimezone(server_timezone).strftime("%Y-%m-%d %H:%M")
+        queryParts.append(f'"{sunset_name}[time stamp]" >= "{sunset_string}"')
+        queryParts.append(f'"{sunset_name}[time stamp]" <= "{sunset_string}"')
     if deprecated_parameter == None:
-        queryString += f' AND "{config.DEPRECATED_PARAMETER_FIELD_NAME.lower()}[labels]" is EMPTY'
+        queryParts.append(f'"{config.DEPRECATED_PARAMETER_FIELD_NAME.lower()}[labels]" is EMPTY')
+    queryString = " AND ".join(queryParts)
 
     # Create query parameter for the HTTP request.
     query = {
@@ -104,7 +159,7 @@ def check_if_issue_exists(config: JIRA_Configuration, deprecation_url: str, http
             # If the parameter is not already in the issue we add it.
             if param not in query_deprecated_parameter:
                 url = f"{config.API_URL}/3/issue/{issue["id"]}"
-                payload = json.dumps({
+                payload = _dumps({
                     "update": { 
                         config.DEPRECATED_PARAMETER_FIELD: [
                             {
@@ -126,16 +181,18 @@ def create_new_jira_issue(config: JIRA_Configuration, deprecation_url: str, http
     :param deprecation_datetime: A datetime object of the deprecation HTTP header
     :param sunset_datetime: A datetime object of the sunset HTTP header
     """
+    # Nothing to do if the deprecation detection is disabled.
+    if not _settings.enabled:
+        return
 
-    header = {
-        'Content-Type': 'application/json',
-        'Accept': 'application/json',
-        'Authorization': "Basic %s" % config.BASE64_AUTH
-    }
+    if config.AUTH_HEADER is None:
+        raise ValueError("The jira configuration has no authentication, call create_base64_auth first.")
 
-    # Create new PoolManager for API calls. Import needs to be inside the function to prevent circular imports.
-    from .poolmanager import PoolManager
-    http = PoolManager()
+    # Get the header for the HTTP request.
+    header = _base_header(config.AUTH_HEADER)
+
+    # Get the shared PoolManager for API calls.
+    http = _get_http()
 
     # Create title for the issue
     summaryOperation = f"The API endpoint {deprecation_url} is deprecated."
@@ -143,7 +200,7 @@ def create_new_jira_issue(config: JIRA_Configuration, deprecation_url: str, http
     summary = summaryParameter if deprecated_parameter != None else summaryOperation
 
     # Create payload for the issue
-    payload = json.dumps({
+    payload = _dumps({
         "fields": {
             config.DEPRECATION_URL_FIELD: deprecation_url, # URL of the deprecated API endpoint
             config.DEPRECATION_HTTP_FIELD: deprecation_datetime.isoformat() if deprecation_datetime else deprecation_datetime, # Deprecation Timestamp
@@ -1,7 +1,17 @@
+import atexit
 import json
+import logging
+import os
+import queue
+import threading
+import time
 from dataclasses import dataclass
 import datetime
+import typing
 
+from ._notification import _dumps, _get_http, _settings
+
+log = logging.getLogger(__name__)
 
 @dataclass
 class Slack_Configuration:
@@ -9,9 +19,238 @@ class Slack_Configuration:
     attachment_color: str = "#fca103"
     file_path: str = "slack_messages.json"
 
+# Hashable key of a message, as (url, http method, deprecated parameter, deprecation header, sunset header).
+_MessageKey = tuple[str | None, str | None, tuple[str, ...] | None, str | None, str | None]
+
+# Message keys of the files by path, together with the (modification time, size, device, inode) of the file,
+# the byte offset they were read up to and the last byte that was read.
+_SLACK_CACHE: dict[str, tuple[tuple[int, int, int, int], int, set[_MessageKey], bytes]] = {}
+
+# Keys of the messages by file path, that are queued but not written to the file yet.
+_PENDING: dict[str, set[_MessageKey]] = {}
+
+# Messages for the background worker, as (webhook url, payload, file path, line, key), or an event to flush.
+_QUEUE: queue.SimpleQueue[tuple[str, bytes, str, str, _MessageKey] | threading.Event] = queue.SimpleQueue()
+_WORKER: threading.Thread | None = None
+_WORKER_LOCK = threading.Lock()
+
+# Sent messages are written to the files every _FLUSH_EVENTS messages or after _FLUSH_INTERVAL seconds.
+_FLUSH_EVENTS = 50
+_FLUSH_INTERVAL = 0.5
+
+# Limits for sending a message, so a hanging webhook does not block the worker and all later messages.
+_SEND_TIMEOUT = 10.0
+_SEND_RETRIES = 2
+
+def _load_message_keys(file_path: str) -> set[_MessageKey]:
+    """
+    Returns the keys of the sent messages from the file. The file contains one JSON message per line.
+    Only lines appended since the last call are parsed. If the file was replaced or rewritten it is parsed again completely.
+    Files in the former format, a single JSON array, are read as well. Invalid messages are logged and skipped.
+    Raises FileNotFoundError if the file is not existent.
+
+    :param file_path: Path of the file with the sent messages
+    """
+    stat = os.stat(file_path)
+    # The modification time alone is too coarse on many filesystems, an append in the same tick would be missed.
+    signature = (stat.st_mtime_ns, stat.st_size, stat.st_dev, stat.st_ino)
+    cached = _SLACK_CACHE.get(file_path)
+    if cached and cached[0] == signature:
+        return cached[2]
+
+    # Continue after the last read line if it is still the same file and it only grew.
+    if cached and cached[0][2:] == signature[2:] and stat.st_size >= cached[1]:
+        offset, keys, last = cached[1], cached[2], cached[3]
+    else:
+        offset, keys, last = 0, set(), b""
+
+    with open(file_path, "rb") as jsonl_file:
+        # If the last read byte changed, the file was rewritten in place and is read again completely.
+        if offset:
+            jsonl_file.seek(offset - 1)
+            if jsonl_file.read(1) != last:
+                offset, keys = 0, set()
+        jsonl_file.seek(offset)
+        data = jsonl_file.read()
+
+    start = 0
+    invalid = 0
+    if offset == 0 and data.lstrip().startswith(b"["):
+        start, invalid = _parse_legacy_messages(data, keys)
+
+    # Only parse complete lines. A partly written line is parsed on a later call.
+    end = max(data.rfind(b"\n") + 1, start)
+    for line in data[start:end].splitlines():
+        if not line.strip():
+            continue
+        try:
+            keys.add(_message_key(json.loads(line)))
+        except (ValueError, AttributeError, TypeError):
+            invalid += 1
+    if invalid:
+        log.warning("Skipped %d invalid slack messages in %s", invalid, file_path)
+
+    if end:
+        last = data[end - 1:end]
+    _SLACK_CACHE[file_path] = (signature, offset + end, keys, last)
+    return keys
+
+def _parse_legacy_messages(data: bytes, keys: set[_MessageKey]) -> tuple[int, int]:
+    """
+    Adds the keys of a file in the former format, a single JSON array of messages, which may be followed by appended lines.
+    Returns the byte offset after the array and the number of invalid messages.
+
+    :param data: The content of the file
+    :param keys: The set the keys are added to
+    """
+    try:
+        text = data.decode("utf-8")
+        messages, end = json.JSONDecoder().raw_decode(text, len(text) - len(text.lstrip()))
+    except ValueError:
+        # Not a valid array, so every line is handled as an invalid message.
+        return 0, 0
+
+    invalid = 0
+    for message in messages:
+        try:
+            keys.add(_message_key(message))
+        except (AttributeError, TypeError):
+            invalid += 1
+    return len(text[:end].encode("utf-8")), invalid
+
+def _build_message(deprecation_url: str, http_method: str, deprecated_parameter: list[str] | None = None, deprecation_datetime: datetime.datetime | None = None, sunset_datetime: datetime.datetime | None = None) -> dict[str, typing.Any]:
+    """
+    Creates the message that is stored for a sent notification. The same message is used to check if a notification was already sent.
+
+    :param deprecation_url: The URL of the deprecated API
+    :param http_method: The HTTP method used to call the deprecated API
+    :param deprecated_parameter: The parameter that are deprecated form the HTTP call
+    :param deprecation_datetime: A datetime object of the deprecation HTTP header
+    :param sunset_datetime: A datetime object of the sunset HTTP header
+    """
+    return {
+        "url": deprecation_url,
+        "http-method": http_method,
+        "deprecated-parameter": sorted(deprecated_parameter) if deprecated_parameter else None,
+        "deprecation-header": deprecation_datetime.isoformat() if deprecation_datetime else None,
+        "sunset-header": sunset_datetime.isoformat() if sunset_datetime else None
+    }
+
+def _message_key(message: dict[str, typing.Any]) -> _MessageKey:
+    """
+    Returns a hashable key of a message, so sent messages can be compared by a set lookup.
+
+    :param message: A message created by _build_message or read from the file
+    """
+    deprecated_parameter = message.get("deprecated-parameter")
+    return (
+        message.get("url"),
+        message.get("http-method"),
+        tuple(deprecated_parameter) if deprecated_parameter else None,
+        message.get("deprecation-header"),
+        message.get("sunset-header")
+    )
+
+def _write_lines(buffer: list[tuple[str, str, _MessageKey]]) -> None:
+    """
+    Appends the buffered lines to their files, with one write per file.
+
+    :param buffer: The buffered messages as (file path, line, key)
+    """
+    lines_by_path: dict[str, list[str]] = {}
+    for file_path, line, _ in buffer:
+        lines_by_path.setdefault(file_path, []).append(line)
+    for file_path, lines in lines_by_path.items():
+        try:
+            with open(file_path, "a", encoding="utf-8") as jsonl_file:
+                jsonl_file.write("".join(lines))
+        except OSError:
+            log.warning("Failed to write the sent slack messages to %s", file_path, exc_info=True)
+    # The messages are readable from the files now.
+    for file_path, _, key in buffer:
+        _PENDING.get(file_path, set()).discard(key)
+    buffer.clear()
+
+def _run_worker() -> None:
+    """
+    Sends the queued messages via webhook and appends them to their files in batches.
+    """
+    buffer: list[tuple[str, str, _MessageKey]] = []
+    deadline: float | None = None
+    while True:
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+        try:
+            item = _QUEUE.get(timeout=timeout)
+        except queue.Empty:
+            item = None
+
+        if isinstance(item, threading.Event):
+            # Write everything that was sent until now and wake up the waiting flush().
+            _write_lines(buffer)
+            deadline = None
+            item.set()
+            continue
+
+        if item is not None:
+            webhook_url, payload, file_path, line, key = item
+            try:
+                _get_http().request("POST", webhook_url, body=payload, timeout=_SEND_TIMEOUT, retries=_SEND_RETRIES)
+            except Exception:
+                log.warning("Failed to send the slack message to %s", webhook_url, exc_info=True)
+                # Not sent, so it may be sent again by a later call.
+                _PENDING.get(file_path, set()).discard(key)
+            else:
+                buffer.append((file_path, line, key))
+                if deadline is None:
+                    deadline = time.monotonic() + _FLUSH_INTERVAL
+
+        if buffer and (len(buffer) >= _FLUSH_EVENTS or (deadline is not None and time.monotonic() >= deadline)):
+            _write_lines(buffer)
+            deadline = None
+
+def _start_worker() -> None:
+    """
+    Starts the background worker on the first call.
+    """
+    global _WORKER
+    with _WORKER_LOCK:
+        if _WORKER is None:
+            _WORKER = threading.Thread(target=_run_worker, name="urllib3-slack", daemon=True)
+            _WORKER.start()
+            # Write out the queued messages when the interpreter exits.
+            atexit.register(flush, 5.0)
+
+def _reset_after_fork() -> None:
+    """
+    Resets the state of the background worker in a forked child process.
+    The worker thread is not copied into the child, and the queue and lock may have been in use by it while forking.
+    The messages of the parent are left to the parent, the child starts its own worker on its first message.
+    """
+    global _QUEUE, _WORKER, _WORKER_LOCK, _PENDING
+    _QUEUE = queue.SimpleQueue()
+    _WORKER = None
+    _WORKER_LOCK = threading.Lock()
+    _PENDING = {}
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def flush(timeout: float | None = None) -> None:
+    """
+    Waits until all queued messages are sent via webhook and written to their files.
+
+    :param timeout: Maximum number of seconds to wait, waits without limit if None
+    """
+    if _WORKER is None:
+        return
+    done = threading.Event()
+    _QUEUE.put(done)
+    done.wait(timeout)
+
 def send_deprecation_webhook_slack(config: Slack_Configuration, deprecation_url: str, http_method: str, deprecated_parameter: list[str] = None, deprecation_datetime: datetime.datetime = None, sunset_datetime: datetime.datetime = None) -> None:
     """
     Sends a message via webhook in a slack channel with the given parameter.
+    The message is sent and written to the file by a background worker, call flush() to wait for it.
 
     :param config: Configuration of the slack integration
     :param deprecation_url: The URL of the deprecated API
@@ -20,9 +259,12 @@ def send_deprecation_webhook_slack(config: Slack_Configuration, deprecation_url:
     :param deprecation_datetime: A datetime object of the deprecation HTTP header
     :param sunset_datetime: A datetime object of the sunset HTTP header
     """
-    # Create new PoolManager for API calls. Import needs to be inside the function to prevent circular imports.
-    from .poolmanager import PoolManager
-    http = PoolManager()
+    # Nothing to do if the deprecation detection is disabled.
+    if not _settings.enabled:
+        return
+
+    # Create new message for given parameter. Its formatted datetimes are reused for the template.
+    new_message = _build_message(deprecation_url, http_method, deprecated_parameter, deprecation_datetime, sunset_datetime)
 
     summaryOperation = f"An API endpoint is deprecated."
     summaryParameter = f"At least one parameter of an API endpoint is deprecated."
@@ -55,39 +297,26 @@ def send_deprecation_webhook_slack(config: Slack_Configuration, deprecation_url:
         }
     ]
 
-    # Add optional parts to the template
-    if deprecated_parameter:
-        template.append({
-            "type": "section",
-            "fields": [
-                {
-                    "type": "mrkdwn",
-                    "text": f"*Parameter:*\n`{', '.join(deprecated_parameter)}`"
-                }
-            ]
-        })
-    if deprecation_datetime:
-        template.append({
-            "type": "section",
-            "fields": [
-                {
-                    "type": "mrkdwn",
-                    "text": f"*HTTP Deprecation Datetime:*\n{deprecation_datetime.isoformat()}"
-                }
-            ]
-        })
-    if sunset_datetime:
-        template.append({
+    # Add optional parts to the template, for every value that is set.
+    optionals = [
+        (deprecated_parameter, lambda parameter: f"*Parameter:*\n`{', '.join(parameter)}`"),
+        (new_message["deprecation-header"], lambda header: f"*HTTP Deprecation Datetime:*\n{header}"),
+        (new_message["sunset-header"], lambda header: f"*HTTP Sunset Datetime:*\n{header}"),
+    ]
+    template.extend(
+        {
             "type": "section",
             "fields": [
                 {
                     "type": "mrkdwn",
-                    "text": f"*HTTP Sunset Datetime:*\n{sunset_datetime.isoformat()}"
+                    "text": formatter(value)
                 }
             ]
-        })
+        }
+        for value, formatter in optionals if value
+    )
 
-    payload = json.dumps({
+    payload = _dumps({
         "attachments": [
             {
                 "color": config.attachment_color,
@@ -96,30 +325,13 @@ def send_deprecation_webhook_slack(config: Slack_Configuration, deprecation_url:
         ]
     })
 
-    response = http.request("POST", config.webhook_url, body=payload)
-
-    # Try opening the file. If the file is not existent we never send a message.
-    try:
-        with open(config.file_path, "r") as json_file:
-            old_messages = json.load(json_file)
-    except FileNotFoundError:
-        old_messages = []
-
-    # Create new message for given parameter
-    new_message = {
-        "url": deprecation_url,
-        "http-method": http_method,
-        "deprecated-parameter": sorted(deprecated_parameter) if deprecated_parameter else None,
-        "deprecation-header": deprecation_datetime.isoformat() if deprecation_datetime else None,
-        "sunset-header": sunset_datetime.isoformat() if sunset_datetime else None
-    }
-
-    # Append new message
-    old_messages.append(new_message)
+    # Remember the message until it is written, so it is not sent twice in the meantime.
+    key = _message_key(new_message)
+    _PENDING.setdefault(config.file_path, set()).add(key)
 
-    # Write messages to file
-    with open(config.file_path, "w") as json_file:
-        json.dump(old_messages, json_file, indent=4)
+    # Queue the message for the background worker, which sends it and appends it to the file.
+    _start_worker()
+    _QUEUE.put((config.webhook_url, payload, config.file_path, json.dumps(new_message) + "\n", key))
 
 def check_if_already_send(config: Slack_Configuration, deprecation_url: str, http_method: str, deprecated_parameter: list[str] = None, deprecation_datetime: datetime.datetime = None, sunset_datetime: datetime.datetime = None) -> bool:
     """
@@ -134,26 +346,23 @@ def check_if_already_send(config: Slack_Configuration, deprecation_url: str, htt
 
     :return: A bool whether the message already exists.
     """
+    # Nothing to do if the deprecation detection is disabled.
+    if not _settings.enabled:
+        return False
 
     # Create new message for given parameter
-    new_message = {
-        "url": deprecation_url,
-        "http-method": http_method,
-        "deprecated-parameter": sorted(deprecated_parameter) if deprecated_parameter else None,
-        "deprecation-header": deprecation_datetime.isoformat() if deprecation_datetime else None,
-        "sunset-header": sunset_datetime.isoformat() if sunset_datetime else None
-    }
+    new_message = _build_message(deprecation_url, http_method, deprecated_parameter, deprecation_datetime, sunset_datetime)
+
+    # Check the messages that are queued but not written yet.
+    key = _message_key(new_message)
+    if key in _PENDING.get(config.file_path, ()):
+        return True
 
     # Try opening the file. If the file is not existent we never send a message.
     try:
-        with open(config.file_path, "r") as json_file:
-            old_messages = json.load(json_file)
+        sent_messages = _load_message_keys(config.file_path)
     except FileNotFoundError:
         return False 
 
     # Check in the messages from the file if they match.
-    for message in old_messages:
-        if new_message == message:
-            return True
-        
-    return False
\ No newline at end of file
+    return key in sent_messages
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import logging
+import typing
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from urllib3 import _notification, deprecation
+from urllib3._notification import _Settings
+from urllib3.deprecation import (
+    Logging_Configuration,
+    add_deprecation_http_header,
+    are_parameter_deprecated,
+    create_log,
+    deprecation_detection,
+    get_deprecation_detection,
+    get_deprecation_http_header,
+    get_logging_configuration,
+    is_operation_deprecated,
+    set_deprecation_http_header,
+    set_deprecation_notification,
+)
+
+
+def make_oas() -> dict[str, typing.Any]:
+    return {
+        "openapi": "3.0.0",
+        "info": {"title": "Test", "version": "1.0"},
+        "paths": {
+            "/old": {"get": {"deprecated": True}},
+            "/items": {
+                "get": {
+                    "parameters": [
+                        {"name": "limit", "in": "query"},
+                        {"name": "page", "in": "query", "deprecated": True},
+                        {"name": "sort", "in": "query", "deprecated": True},
+                        {"name": "page", "in": "header", "deprecated": True},
+                    ]
+                },
+                "post": {},
+            },
+        },
+    }
+
+
+@pytest.fixture
+def settings(monkeypatch: pytest.MonkeyPatch) -> _Settings:
+    # The settings are shared with jira and slack, so they are reset in place.
+    settings = _notification._settings
+    for settings_field in dataclasses.fields(_Settings):
+        monkeypatch.setattr(
+            settings, settings_field.name, getattr(_Settings(), settings_field.name)
+        )
+    return settings
+
+
+class TestSettings:
+    def test_defaults(self, settings: _Settings) -> None:
+        assert get_deprecation_detection() is False
+        assert get_deprecation_http_header() == []
+        assert get_logging_configuration() is None
+
+    def test_setters(self, settings: _Settings) -> None:
+        config = Logging_Configuration()
+        deprecation_detection(True)
+        set_deprecation_http_header(["X-Deprecated"])
+        add_deprecation_http_header(["X-Sunset"])
+        set_deprecation_notification(logging=config)
+
+        assert get_deprecation_detection() is True
+        assert get_deprecation_http_header() == ["X-Deprecated", "X-Sunset"]
+        assert get_logging_configuration() is config
+        assert settings.enabled is True
+        assert deprecation._settings is settings
+
+
+class TestIsOperationDeprecated:
+    @pytest.mark.parametrize(
+        "path, method, expected",
+        [
+            ("/old", "GET", True),
+            ("/old", "get", True),
+            ("/items", "GET", False),
+            ("/items", "post", False),
+        ],
+    )
+    def test_is_operation_deprecated(
+        self, path: str, method: str, expected: bool
+    ) -> None:
+        assert is_operation_deprecated(make_oas(), path, method) is expected
+
+    def test_unknown_path(self) -> None:
+        with pytest.raises(KeyError, match="Path /missing not found"):
+            is_operation_deprecated(make_oas(), "/missing", "GET")
+
+    def test_unknown_method(self) -> None:
+        with pytest.raises(KeyError, match="Method DELETE for path /old not found"):
+            is_operation_deprecated(make_oas(), "/old", "delete")
+
+    def test_changed_specification(self) -> None:
+        oas = make_oas()
+        assert is_operation_deprecated(oas, "/old", "GET") is True
+        oas["paths"]["/old"]["get"]["deprecated"] = False
+        assert is_operation_deprecated(oas, "/old", "GET") is False
+
+
+class TestAreParameterDeprecated:
+    def test_deprecated_query_parameter(self) -> None:
+        assert are_parameter_deprecated(
+            make_oas(), "/items", "GET", ["limit", "page"]
+        ) == (True, ["page"])
+
+    def test_no_deprecated_parameter(self) -> None:
+        assert are_parameter_deprecated(make_oas(), "/items", "get", ["limit"]) == (
+            False,
+            [],
+        )
+
+    def test_unknown_path(self) -> None:
+        with pytest.raises(KeyError, match="Path /missing not found"):
+            are_parameter_deprecated(make_oas(), "/missing", "GET", ["page"])
+
+    def test_operation_without_parameters(self) -> None:
+        assert are_parameter_deprecated(make_oas(), "/items", "POST", ["page"]) == (
+            False,
+            [],
+        )
+
+    def test_deprecated_parameter_order(self) -> None:
+        assert are_parameter_deprecated(
+            make_oas(), "/items", "GET", ["sort", "limit", "page"]
+        ) == (True, ["page", "sort"])
+
+    def test_changed_specification(self) -> None:
+        oas = make_oas()
+        assert are_parameter_deprecated(oas, "/items", "GET", ["limit"]) == (
+            False,
+            [],
+        )
+        oas["paths"]["/items"]["get"]["parameters"][0]["deprecated"] = True
+        assert are_parameter_deprecated(oas, "/items", "GET", ["limit"]) == (
+            True,
+            ["limit"],
+        )
+
+    def test_no_parameter(self) -> None:
+        # Without parameter the specification is not looked at.
+        assert are_parameter_deprecated({}, "/missing", "GET", []) == (False, [])
+
+    def test_unknown_method(self) -> None:
+        with pytest.raises(KeyError, match="Method PUT for path /items not found"):
+            are_parameter_deprecated(make_oas(), "/items", "put", ["page"])
+
+
+class TestCreateLog:
+    @pytest.fixture(autouse=True)
+    def detection_enabled(self, settings: _Settings) -> None:
+        settings.enabled = True
+
+    @pytest.fixture
+    def log_file(self, tmp_path: Path) -> typing.Generator[Path, None, None]:
+        log_file = tmp_path / "deprecation.log"
+        yield log_file
+        for logger in deprecation._LOGGERS.values():
+            for handler in logger.handlers[:]:
+                handler.close()
+                logger.removeHandler(handler)
+        deprecation._LOGGERS.clear()
+
+    def test_logger_shared_between_configurations(self, log_file: Path) -> None:
+        create_log(Logging_Configuration(file=str(log_file)), "http://a", "GET")
+        create_log(Logging_Configuration(file=str(log_file)), "http://b", "GET")
+
+        lines = log_file.read_text().splitlines()
+        assert len(lines) == 2
+        assert "Deprecation Alert: URL=http://a, HTTP Method=GET" in lines[0]
+        assert "Deprecation Alert: URL=http://b, HTTP Method=GET" in lines[1]
+
+    def test_logger_per_settings(self, log_file: Path, tmp_path: Path) -> None:
+        other_file = tmp_path / "other.log"
+        create_log(
+            Logging_Configuration(file=str(log_file), lvl=logging.ERROR),
+            "http://a",
+            "GET",
+        )
+        create_log(
+            Logging_Configuration(file=str(log_file), format="%(message)s"),
+            "http://b",
+            "GET",
+        )
+        create_log(Logging_Configuration(file=str(other_file)), "http://c", "GET")
+
+        # Other settings for the same file neither share level nor handler.
+        lines = log_file.read_text().splitlines()
+        assert len(lines) == 1
+        assert lines[0].startswith("Deprecation Alert: URL=http://b")
+        assert "URL=http://c" in other_file.read_text()
+
+        logger = deprecation._get_logger(str(log_file), "%(message)s", logging.DEBUG)
+        assert logger is deprecation._get_logger(
+            str(log_file), "%(message)s", logging.DEBUG
+        )
+        assert logger is not deprecation._get_logger(
+            str(log_file), "%(message)s", logging.ERROR
+        )
+
+    def test_logger_name(self, log_file: Path) -> None:
+        create_log(Logging_Configuration(file=str(log_file)), "http://a", "GET")
+
+        assert " - deprecation_logger - WARNING - Deprecation Alert" in log_file.read_text()
+
+    def test_message(self, log_file: Path) -> None:
+        create_log(
+            Logging_Configuration(file=str(log_file), format="%(message)s"),
+            "http://a",
+            "GET",
+            deprecated_parameter=["page"],
+            sunset_datetime=datetime.datetime(2024, 5, 1, tzinfo=datetime.timezone.utc),
+        )
+
+        assert log_file.read_text() == (
+            "Deprecation Alert: URL=http://a, HTTP Method=GET, "
+            "Deprecated Parameters=['page'], Deprecation Date=None, "
+            "Sunset Date=2024-05-01T00:00:00+00:00\n"
+        )
+
+    def test_detection_disabled(
+        self, settings: _Settings, log_file: Path
+    ) -> None:
+        settings.enabled = False
+
+        create_log(Logging_Configuration(file=str(log_file)), "http://a", "GET")
+
+        assert not log_file.exists()
+
+    def test_message_not_formatted_if_disabled(self, log_file: Path) -> None:
+        config = Logging_Configuration(lvl=logging.ERROR, file=str(log_file))
+        sunset = mock.Mock()
+
+        create_log(config, "http://a", "GET", sunset_datetime=sunset)
+
+        sunset.isoformat.assert_not_called()
+        assert log_file.read_text() == ""
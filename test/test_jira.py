@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import datetime
+import typing
+from unittest import mock
+
+import pytest
+
+from urllib3 import _notification, jira
+from urllib3.jira import JIRA_Configuration
+
+
+def make_config(
+    api_url: str = "https://jira.example.com/rest/api",
+) -> JIRA_Configuration:
+    return JIRA_Configuration(
+        API_URL=api_url,
+        API_TOKEN="token",
+        USER_EMAIL="user@example.com",
+        DEPRECATION_ISSUE_TYPE_KEY="Deprecation",
+        DEPRECATION_ISSUE_TYPE_ID="10001",
+        PROJECT_KEY="DEP",
+        PROJECT_ID="10000",
+        DEPRECATION_URL_FIELD="customfield_1",
+        DEPRECATION_URL_FIELD_NAME="Deprecation URL",
+        DEPRECATION_HTTP_FIELD="customfield_2",
+        DEPRECATION_HTTP_FIELD_NAME="Deprecation",
+        SUNSET_HTTP_FIELD="customfield_3",
+        SUNSET_HTTP_FIELD_NAME="Sunset",
+        HTTP_METHOD_FIELD="customfield_4",
+        HTTP_METHOD_FIELD_NAME="HTTP Method",
+        DEPRECATED_PARAMETER_FIELD="customfield_5",
+        DEPRECATED_PARAMETER_FIELD_NAME="Deprecated Parameter",
+    )
+
+
+def make_http(server_time: str = "2024-05-01T12:30:00.000+0200") -> mock.Mock:
+    http = mock.Mock()
+    http.request.return_value.json.return_value = {"serverTime": server_time}
+    return http
+
+
+@pytest.fixture(autouse=True)
+def detection_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(_notification._settings, "enabled", True)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches() -> typing.Generator[None, None, None]:
+    yield
+    jira._SERVER_TZ_CACHE.clear()
+
+
+class TestServerTimezone:
+    def test_server_timezone_is_cached(self) -> None:
+        config = make_config()
+        http = make_http()
+
+        tz = jira._get_server_timezone(config, http, {})
+        assert tz.utcoffset(None) == datetime.timedelta(hours=2)
+        assert jira._get_server_timezone(config, http, {}) is tz
+        assert http.request.call_count == 1
+
+    def test_server_timezone_cached_per_api_url(self) -> None:
+        http = make_http()
+
+        jira._get_server_timezone(make_config("https://a.example.com"), http, {})
+        jira._get_server_timezone(make_config("https://b.example.com"), http, {})
+        assert http.request.call_count == 2
+
+    def test_server_timezone_expires(self) -> None:
+        config = make_config()
+        http = make_http()
+
+        with mock.patch("time.monotonic", return_value=0.0):
+            jira._get_server_timezone(config, http, {})
+        with mock.patch("time.monotonic", return_value=jira._SERVER_TZ_TTL + 1.0):
+            jira._get_server_timezone(config, http, {})
+        assert http.request.call_count == 2
+
+
+class TestCheckIfIssueExists:
+    def test_query(self) -> None:
+        config = jira.create_base64_auth(make_config())
+        http = make_http("2024-05-01T12:30:00.000+0000")
+        http.request.return_value.json.return_value["issues"] = []
+        deprecation = datetime.datetime(
+            2024, 5, 1, 14, 0, tzinfo=datetime.timezone(datetime.timedelta(hours=2))
+        )
+
+        with mock.patch.object(jira, "_get_http", return_value=http):
+            assert not jira.check_if_issue_exists(
+                config,
+                "https://api.example.com:443/items",
+                "get",
+                deprecation_datetime=deprecation,
+            )
+
+        jql = http.request.call_args.kwargs["fields"]["jql"]
+        assert jql == (
+            'type = Deprecation AND project = DEP'
+            ' AND "deprecation url[url field]" = "https://api.example.com:443/items"'
+            ' AND "http method[short text]" ~ "GET" AND status != Done'
+            ' AND "deprecation[time stamp]" >= "2024-05-01 12:00"'
+            ' AND "deprecation[time stamp]" <= "2024-05-01 12:00"'
+            ' AND "deprecated parameter[labels]" is EMPTY'
+        )
+
+    def test_disabled(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(_notification._settings, "enabled", False)
+        http = make_http()
+
+        with mock.patch.object(jira, "_get_http", return_value=http):
+            assert not jira.check_if_issue_exists(
+                make_config(), "https://api.example.com", "GET"
+            )
+            jira.create_new_jira_issue(make_config(), "https://api.example.com", "GET")
+        http.request.assert_not_called()
+
+    def test_requires_authentication(self) -> None:
+        with pytest.raises(ValueError, match="create_base64_auth"):
+            jira.check_if_issue_exists(make_config(), "https://api.example.com", "GET")
+
+
+class TestCreateBase64Auth:
+    def test_auth_header(self) -> None:
+        config = jira.create_base64_auth(make_config())
+        assert config.BASE64_AUTH == "dXNlckBleGFtcGxlLmNvbTp0b2tlbg=="
+        assert config.AUTH_HEADER == "Basic dXNlckBleGFtcGxlLmNvbTp0b2tlbg=="
+
+    def test_base_header_shared(self) -> None:
+        config = jira.create_base64_auth(make_config())
+        header = jira._base_header(config.AUTH_HEADER)
+        assert header["Authorization"] == config.AUTH_HEADER
+        assert jira._base_header(config.AUTH_HEADER) is header
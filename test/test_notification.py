@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import json
+import typing
+
+import pytest
+
+from urllib3 import _notification, jira, slack
+from urllib3.poolmanager import PoolManager
+
+
+@pytest.fixture
+def http_reset(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(_notification, "_HTTP", None)
+
+
+class TestNotification:
+    def test_dumps(self) -> None:
+        obj: dict[str, typing.Any] = {"text": "Größe", "fields": [1, None]}
+        payload = _notification._dumps(obj)
+        assert payload == b'{"text":"Gr\\u00f6\\u00dfe","fields":[1,null]}'
+        assert json.loads(payload) == obj
+
+    def test_http_shared(self, http_reset: None) -> None:
+        http = _notification._get_http()
+        assert isinstance(http, PoolManager)
+        assert _notification._get_http() is http
+
+    def test_helpers_shared(self) -> None:
+        assert jira._get_http is slack._get_http is _notification._get_http
+        assert jira._dumps is slack._dumps is _notification._dumps
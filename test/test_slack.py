@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import datetime
+import json
+import os
+import socket
+import threading
+import time
+import typing
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from urllib3 import _notification, slack
+from urllib3.slack import (
+    Slack_Configuration,
+    check_if_already_send,
+    flush,
+    send_deprecation_webhook_slack,
+)
+
+DEPRECATION = datetime.datetime(2024, 5, 1, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+@pytest.fixture
+def config(tmp_path: Path) -> Slack_Configuration:
+    return Slack_Configuration(
+        webhook_url="https://hooks.example.com/services/T0/B0/X",
+        file_path=str(tmp_path / "slack_messages.jsonl"),
+    )
+
+
+@pytest.fixture(autouse=True)
+def detection_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(_notification._settings, "enabled", True)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches() -> typing.Generator[None, None, None]:
+    yield
+    flush()
+    slack._SLACK_CACHE.clear()
+    slack._PENDING.clear()
+
+
+@pytest.fixture
+def http() -> typing.Generator[mock.Mock, None, None]:
+    http = mock.Mock()
+    with mock.patch.object(slack, "_get_http", return_value=http):
+        yield http
+
+
+class TestSlack:
+    def test_not_sent_without_history(self, config: Slack_Configuration) -> None:
+        assert not check_if_already_send(config, "https://api.example.com", "GET")
+
+    def test_send_records_message(
+        self, config: Slack_Configuration, http: mock.Mock
+    ) -> None:
+        send_deprecation_webhook_slack(
+            config,
+            "https://api.example.com/items",
+            "GET",
+            deprecated_parameter=["sort", "page"],
+            deprecation_datetime=DEPRECATION,
+        )
+        flush()
+
+        assert http.request.call_count == 1
+        method, url = http.request.call_args.args
+        assert (method, url) == ("POST", config.webhook_url)
+        blocks = json.loads(http.request.call_args.kwargs["body"])["attachments"][0][
+            "blocks"
+        ]
+        texts = [block["fields"][0]["text"] for block in blocks[3:]]
+        assert texts == [
+            "*Parameter:*\n`sort, page`",
+            "*HTTP Deprecation Datetime:*\n2024-05-01T12:00:00+00:00",
+        ]
+
+        # The order of the parameter is irrelevant for the check.
+        assert check_if_already_send(
+            config,
+            "https://api.example.com/items",
+            "GET",
+            deprecated_parameter=["page", "sort"],
+            deprecation_datetime=DEPRECATION,
+        )
+        assert not check_if_already_send(
+            config,
+            "https://api.example.com/items",
+            "GET",
+            deprecated_parameter=["page"],
+            deprecation_datetime=DEPRECATION,
+        )
+        assert not check_if_already_send(
+            config, "https://api.example.com/items", "GET"
+        )
+
+    def test_history_read_incrementally(self, config: Slack_Configuration) -> None:
+        def message(url: str) -> str:
+            return json.dumps(
+                {
+                    "url": url,
+                    "http-method": "GET",
+                    "deprecated-parameter": None,
+                    "deprecation-header": None,
+                    "sunset-header": None,
+                }
+            )
+
+        with open(config.file_path, "w") as f:
+            f.write(message("https://api.example.com/a") + "\n")
+        assert check_if_already_send(config, "https://api.example.com/a", "GET")
+
+        # An unchanged file is not parsed again.
+        with mock.patch("json.loads") as loads:
+            assert check_if_already_send(config, "https://api.example.com/a", "GET")
+        loads.assert_not_called()
+
+        # Only appended lines are parsed, a partly written line is skipped.
+        with open(config.file_path, "a") as f:
+            f.write(message("https://api.example.com/b") + "\n")
+            f.write(message("https://api.example.com/c"))
+        with mock.patch("json.loads", wraps=json.loads) as loads:
+            assert check_if_already_send(config, "https://api.example.com/b", "GET")
+            assert not check_if_already_send(
+                config, "https://api.example.com/c", "GET"
+            )
+        assert loads.call_count == 1
+        with open(config.file_path, "a") as f:
+            f.write("\n")
+        assert check_if_already_send(config, "https://api.example.com/c", "GET")
+
+        # A replaced file is parsed again.
+        with open(config.file_path, "w") as f:
+            f.write(message("https://api.example.com/d") + "\n")
+        assert not check_if_already_send(config, "https://api.example.com/a", "GET")
+        assert check_if_already_send(config, "https://api.example.com/d", "GET")
+
+    def test_append_within_same_mtime(self, config: Slack_Configuration) -> None:
+        def line(url: str) -> str:
+            return json.dumps({"url": url, "http-method": "GET"}) + "\n"
+
+        with open(config.file_path, "w") as f:
+            f.write(line("https://api.example.com/a"))
+        assert check_if_already_send(config, "https://api.example.com/a", "GET")
+        stat = os.stat(config.file_path)
+
+        with open(config.file_path, "a") as f:
+            f.write(line("https://api.example.com/b"))
+        # Simulate a filesystem with coarse timestamps.
+        os.utime(config.file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        assert check_if_already_send(config, "https://api.example.com/b", "GET")
+
+    def test_legacy_history(
+        self,
+        config: Slack_Configuration,
+        http: mock.Mock,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        message = {
+            "url": "https://api.example.com/a",
+            "http-method": "GET",
+            "deprecated-parameter": ["page"],
+            "deprecation-header": None,
+            "sunset-header": None,
+        }
+        # Format of the history before it was written as JSON Lines.
+        with open(config.file_path, "w") as f:
+            json.dump([message], f, indent=4)
+
+        assert check_if_already_send(
+            config, "https://api.example.com/a", "GET", deprecated_parameter=["page"]
+        )
+        assert not check_if_already_send(config, "https://api.example.com/b", "GET")
+
+        # New messages are appended after the array.
+        send_deprecation_webhook_slack(config, "https://api.example.com/b", "GET")
+        flush()
+        slack._SLACK_CACHE.clear()
+        assert check_if_already_send(
+            config, "https://api.example.com/a", "GET", deprecated_parameter=["page"]
+        )
+        assert check_if_already_send(config, "https://api.example.com/b", "GET")
+        assert "invalid" not in caplog.text
+
+    def test_default_file_with_legacy_history(
+        self, tmp_path: Path, http: mock.Mock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.chdir(tmp_path)
+        message = {
+            "url": "https://api.example.com/a",
+            "http-method": "GET",
+            "deprecated-parameter": None,
+            "deprecation-header": None,
+            "sunset-header": None,
+        }
+        # History written by a former version with the default configuration.
+        with open("slack_messages.json", "w") as f:
+            json.dump([message], f, indent=4)
+
+        config = Slack_Configuration(webhook_url="https://hooks.example.com/services/T0/B0/X")
+        assert check_if_already_send(config, "https://api.example.com/a", "GET")
+
+        send_deprecation_webhook_slack(config, "https://api.example.com/b", "GET")
+        flush()
+        slack._SLACK_CACHE.clear()
+        assert check_if_already_send(config, "https://api.example.com/a", "GET")
+        assert check_if_already_send(config, "https://api.example.com/b", "GET")
+        assert http.request.call_count == 1
+
+    def test_invalid_lines_skipped(
+        self, config: Slack_Configuration, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        with open(config.file_path, "w") as f:
+            f.write("{not json\n")
+            f.write('"no message"\n')
+            f.write(json.dumps({"url": "https://api.example.com/a", "http-method": "GET"}))
+            f.write("\n")
+
+        assert check_if_already_send(config, "https://api.example.com/a", "GET")
+        assert "Skipped 2 invalid slack messages" in caplog.text
+
+    def test_replaced_file_larger_than_offset(
+        self, config: Slack_Configuration
+    ) -> None:
+        def line(url: str) -> str:
+            return json.dumps({"url": url, "http-method": "GET"}) + "\n"
+
+        with open(config.file_path, "w") as f:
+            f.write(line("https://api.example.com/a"))
+        assert check_if_already_send(config, "https://api.example.com/a", "GET")
+
+        # Rotated history: a new file that is larger than the read offset.
+        new_path = config.file_path + ".new"
+        with open(new_path, "w") as f:
+            f.write(line("https://api.example.com/bb"))
+            f.write(line("https://api.example.com/c"))
+        os.replace(new_path, config.file_path)
+
+        assert not check_if_already_send(config, "https://api.example.com/a", "GET")
+        assert check_if_already_send(config, "https://api.example.com/bb", "GET")
+        assert check_if_already_send(config, "https://api.example.com/c", "GET")
+
+    def test_rewritten_file_read_again(self, config: Slack_Configuration) -> None:
+        def line(url: str) -> str:
+            return json.dumps({"url": url, "http-method": "GET"}) + "\n"
+
+        with open(config.file_path, "w") as f:
+            f.write(line("https://api.example.com/a"))
+        assert check_if_already_send(config, "https://api.example.com/a", "GET")
+
+        # Rewritten in place, the old offset is in the middle of a line now.
+        with open(config.file_path, "w") as f:
+            f.write(line("https://api.example.com/bbbbbb"))
+            f.write(line("https://api.example.com/c"))
+
+        assert not check_if_already_send(config, "https://api.example.com/a", "GET")
+        assert check_if_already_send(config, "https://api.example.com/bbbbbb", "GET")
+        assert check_if_already_send(config, "https://api.example.com/c", "GET")
+
+    def test_send_appends_line(
+        self, config: Slack_Configuration, http: mock.Mock
+    ) -> None:
+        send_deprecation_webhook_slack(config, "https://api.example.com/a", "GET")
+        send_deprecation_webhook_slack(config, "https://api.example.com/b", "GET")
+        flush()
+
+        with open(config.file_path) as f:
+            urls = [json.loads(line)["url"] for line in f]
+        assert urls == ["https://api.example.com/a", "https://api.example.com/b"]
+
+    def test_queued_message_counts_as_sent(
+        self, config: Slack_Configuration, http: mock.Mock
+    ) -> None:
+        sent = threading.Event()
+        http.request.side_effect = lambda *args, **kwargs: sent.wait(5)
+
+        send_deprecation_webhook_slack(config, "https://api.example.com/a", "GET")
+        # The worker has not sent nor written the message yet.
+        assert not os.path.exists(config.file_path)
+        assert check_if_already_send(config, "https://api.example.com/a", "GET")
+
+        sent.set()
+        flush()
+        assert check_if_already_send(config, "https://api.example.com/a", "GET")
+        assert slack._PENDING[config.file_path] == set()
+
+    def test_written_after_interval(
+        self, config: Slack_Configuration, http: mock.Mock
+    ) -> None:
+        send_deprecation_webhook_slack(config, "https://api.example.com/a", "GET")
+
+        deadline = time.monotonic() + slack._FLUSH_INTERVAL + 5
+        while not os.path.exists(config.file_path) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        with open(config.file_path) as f:
+            assert json.loads(f.readline())["url"] == "https://api.example.com/a"
+
+    def test_hanging_webhook(
+        self, config: Slack_Configuration, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(slack, "_SEND_TIMEOUT", 0.2)
+        monkeypatch.setattr(slack, "_SEND_RETRIES", 0)
+        monkeypatch.setattr(_notification, "_HTTP", None)
+        # The server accepts connections but never answers.
+        with socket.socket() as server:
+            server.bind(("127.0.0.1", 0))
+            server.listen(5)
+            host, port = server.getsockname()
+            config.webhook_url = f"http://{host}:{port}/hook"
+
+            send_deprecation_webhook_slack(config, "https://api.example.com/a", "GET")
+            start = time.monotonic()
+            flush(5)
+            assert time.monotonic() - start < 4
+
+        # The message was not sent, so it is neither suppressed nor recorded.
+        assert not check_if_already_send(config, "https://api.example.com/a", "GET")
+        assert not os.path.exists(config.file_path)
+        _notification._get_http().clear()
+
+    def test_failed_send_not_recorded(
+        self, config: Slack_Configuration, http: mock.Mock
+    ) -> None:
+        http.request.side_effect = OSError("unreachable")
+
+        send_deprecation_webhook_slack(config, "https://api.example.com/a", "GET")
+        flush()
+
+        assert not check_if_already_send(config, "https://api.example.com/a", "GET")
+        assert not os.path.exists(config.file_path)
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+    @pytest.mark.filterwarnings("ignore:.*fork\\(\\) may lead to deadlocks:DeprecationWarning")
+    def test_worker_after_fork(
+        self, config: Slack_Configuration, http: mock.Mock
+    ) -> None:
+        sent = threading.Event()
+        http.request.side_effect = lambda *args, **kwargs: sent.wait(5)
+        send_deprecation_webhook_slack(config, "https://api.example.com/a", "GET")
+
+        pid = os.fork()
+        if pid == 0:
+            # The child neither waits for the worker of the parent nor counts its messages as sent.
+            status = 1
+            try:
+                http.request.side_effect = None
+                if not check_if_already_send(
+                    config, "https://api.example.com/a", "GET"
+                ):
+                    send_deprecation_webhook_slack(
+                        config, "https://api.example.com/b", "GET"
+                    )
+                    flush(5)
+                    if check_if_already_send(config, "https://api.example.com/b", "GET"):
+                        status = 0
+            finally:
+                os._exit(status)
+
+        _, status = os.waitpid(pid, 0)
+        sent.set()
+        flush()
+        assert os.waitstatus_to_exitcode(status) == 0
+        with open(config.file_path) as f:
+            urls = [json.loads(line)["url"] for line in f]
+        assert sorted(urls) == ["https://api.example.com/a", "https://api.example.com/b"]
+
+    def test_disabled(
+        self,
+        config: Slack_Configuration,
+        http: mock.Mock,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(_notification._settings, "enabled", False)
+
+        send_deprecation_webhook_slack(config, "https://api.example.com/a", "GET")
+        assert not check_if_already_send(config, "https://api.example.com/a", "GET")
+        http.request.assert_not_called()
+        assert not os.path.exists(config.file_path)